@@ -1,8 +1,13 @@
 import argparse
+import hashlib
+import json
 import logging
+import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
 from pathlib import Path
-from typing import List
+from typing import Any, List, Optional, Tuple
 
 from importlib_resources import files
 
@@ -16,11 +21,22 @@ __license__ = "Apache-2.0"
 
 _logger = logging.getLogger(__name__)
 MAX_ATTEMPTS = 100
+# Maximum number of worker processes trying seeds in parallel
+MAX_SEARCH_WORKERS = 8
 VERSION_A = "a"
 VERSION_B = "b"
 VERSION_C = "c"
 CONDITION_HIGH = "high"
 CONDITION_LOW = "low"
+# Parameter set and scenario versions generated for each condition
+_CONDITION_PARAMS_KEYS = {
+    CONDITION_HIGH: "MATBII_HIGH_PARAMS",
+    CONDITION_LOW: "MATBII_LOW_PARAMS",
+}
+_CONDITION_VERSIONS = {
+    CONDITION_HIGH: (VERSION_A, VERSION_B),
+    CONDITION_LOW: (VERSION_A, VERSION_B, VERSION_C),
+}
 
 
 # ---- Python API ----
@@ -30,12 +46,184 @@ CONDITION_LOW = "low"
 # when using this Python module as a library.
 
 
+@lru_cache(maxsize=1)
 def _get_matbii_params() -> dict:
     parent_path = Path(str(files(matbii)))
     comm_stems_path = Path(parent_path, "matbii_params.json")
     return import_dict_from_json(comm_stems_path)
 
 
+def _get_seed_cache_key(seed: int, params_dict: dict) -> str:
+    """Hash the package version, starting seed and parameters into a seed cache key.
+
+    The package version is part of the key, as another version of the generator can
+    produce different scenarios from the same seed. This is what keeps entries written
+    by other versions from being used.
+    """
+    key_contents = json.dumps(
+        {"version": __version__, "seed": seed, "params": params_dict}, sort_keys=True
+    )
+    return hashlib.sha256(key_contents.encode("utf-8")).hexdigest()
+
+
+def _load_seed_cache(cache_path: Path) -> dict:
+    if not cache_path.is_file():
+        return {}
+    return import_dict_from_json(cache_path)
+
+
+def _get_cached_valid_seed(cache_entry: Any, seed: int) -> Optional[int]:
+    """
+    Get the first valid seed from ``seed`` onward recorded in a seed cache entry.
+
+    The entry is trusted to hold the first valid seed, as its key includes the
+    package version, see ``_get_seed_cache_key``.
+
+    Args:
+        cache_entry (Any): The seed cache entry, or None if there is none.
+        seed (int): First seed that the search started from.
+
+    Returns:
+        Optional[int]: The cached seed, or None if the entry is not a valid seed
+            from ``seed`` onward.
+    """
+    if not isinstance(cache_entry, dict):
+        return None
+    valid_seed = cache_entry.get("valid_seed")
+    if not isinstance(valid_seed, int) or valid_seed < seed:
+        return None
+    return valid_seed
+
+
+def _generate_xml_if_valid(seed: int, params_dict: dict) -> Optional[str]:
+    """Generate the XML for one seed, or None if the seed does not produce a valid XML.
+
+    Args:
+        seed (int): Seed for random number generation.
+        params_dict (dict): Dictionary of parameters required for XML generation.
+
+    Returns:
+        Optional[str]: The XML, or None if its tasks could not all be placed.
+    """
+    random_xml, n_task_types, n_event_times = matbii_generate_random_xml(
+        random_state=seed, comm_stems_path=None, **params_dict
+    )
+    return random_xml if n_task_types == n_event_times else None
+
+
+def _get_n_search_workers() -> int:
+    """Get the number of worker processes to try seeds with.
+
+    Returns:
+        int: The number of CPUs this process may run on, at most
+            ``MAX_SEARCH_WORKERS``.
+    """
+    if hasattr(os, "sched_getaffinity"):
+        n_cpus = len(os.sched_getaffinity(0))
+    else:
+        n_cpus = os.cpu_count() or 1
+    return min(n_cpus, MAX_SEARCH_WORKERS)
+
+
+def _search_valid_xml(
+    seed: int, n_seeds: int, params_dict: dict, n_workers: int = 1
+) -> Tuple[Optional[str], int]:
+    """
+    Find the lowest seed in ``[seed, seed + n_seeds)`` that produces a valid XML.
+
+    The first seed is always tried in this process, as it is often valid. Seeds are
+    independent, so with several workers the next ones are tried in batches of one
+    seed per worker process. Each batch is scanned in seed order, so the result is
+    the same as trying the seeds one by one.
+
+    Args:
+        seed (int): First seed to try.
+        n_seeds (int): Number of consecutive seeds to try.
+        params_dict (dict): Dictionary of parameters required for XML generation.
+        n_workers (int): Number of worker processes to try seeds with, or 1 to try
+            them all in this process. Defaults to 1.
+
+    Returns:
+        Tuple[Optional[str], int]: The XML of the lowest valid seed and that seed, or
+            None and ``-1`` if none of the seeds produced a valid XML.
+    """
+    generate_xml_if_valid = partial(_generate_xml_if_valid, params_dict=params_dict)
+    stop_seed = seed + n_seeds
+    if n_seeds > 0:
+        random_xml = generate_xml_if_valid(seed)
+        if random_xml is not None:
+            return random_xml, seed
+    seed += 1
+    if n_workers == 1 or seed >= stop_seed:
+        for current_seed in range(seed, stop_seed):
+            random_xml = generate_xml_if_valid(current_seed)
+            if random_xml is not None:
+                return random_xml, current_seed
+        return None, -1
+
+    with ProcessPoolExecutor(max_workers=n_workers) as executor:
+        for batch_start in range(seed, stop_seed, n_workers):
+            batch_seeds = range(batch_start, min(batch_start + n_workers, stop_seed))
+            for current_seed, random_xml in zip(
+                batch_seeds, executor.map(generate_xml_if_valid, batch_seeds)
+            ):
+                if random_xml is not None:
+                    return random_xml, current_seed
+    return None, -1
+
+
+def _generate_valid_xml(
+    seed: int,
+    params_dict: dict,
+    max_attempts: int,
+    seed_cache_path: Optional[Path] = None,
+    n_workers: int = 1,
+) -> Tuple[Optional[str], int]:
+    """
+    Generate the first valid XML from ``seed`` onward, trying the cached seed first.
+
+    Args:
+        seed (int): First seed to try.
+        params_dict (dict): Dictionary of parameters required for XML generation.
+        max_attempts (int): Maximum number of seeds to try.
+        seed_cache_path (Optional[Path]): Path to the seed cache file, or None to
+            always search for the seed.
+        n_workers (int): Number of worker processes to search for the seed with.
+            Defaults to 1.
+
+    Returns:
+        Tuple[Optional[str], int]: The XML, or None if no seed produced a valid XML
+            within ``max_attempts``, and the seed after the last one tried.
+    """
+    seed_cache = {}
+    cache_entry = None
+    if seed_cache_path is not None:
+        seed_cache = _load_seed_cache(seed_cache_path)
+        seed_cache_key = _get_seed_cache_key(seed, params_dict)
+        cache_entry = seed_cache.get(seed_cache_key)
+
+    random_xml = None
+    valid_seed = _get_cached_valid_seed(cache_entry, seed)
+    if valid_seed is not None:
+        random_xml = _generate_xml_if_valid(valid_seed, params_dict)
+    if random_xml is None:
+        random_xml, valid_seed = _search_valid_xml(
+            seed, max_attempts, params_dict, n_workers
+        )
+        if random_xml is None:
+            return None, seed + max_attempts
+
+    if valid_seed - seed + 1 >= max_attempts:
+        return None, valid_seed + 1
+
+    new_cache_entry = {"valid_seed": valid_seed}
+    if seed_cache_path is not None and cache_entry != new_cache_entry:
+        seed_cache[seed_cache_key] = new_cache_entry
+        seed_cache_path.parent.mkdir(parents=True, exist_ok=True)
+        seed_cache_path.write_text(json.dumps(seed_cache, indent=4))
+    return random_xml, valid_seed + 1
+
+
 def generate_and_save_xml(
     seed: int,
     params_dict: dict,
@@ -43,6 +231,8 @@ def generate_and_save_xml(
     condition: str,
     version: str,
     max_attempts: int = MAX_ATTEMPTS,
+    seed_cache_path: Optional[Path] = None,
+    n_workers: int = 1,
 ) -> None:
     """
     Generate and save an XML file based on the provided parameters.
@@ -59,32 +249,40 @@ def generate_and_save_xml(
             saved XML.
         max_attempts (int, optional): Maximum number of attempts to generate the XML
             file given the default parameters. Defaults to MAX_ATTEMPTS.
+        seed_cache_path (Optional[Path], optional): Path to a JSON file remembering
+            the valid seeds between runs. Defaults to None, which does not use a seed
+            cache.
+        n_workers (int, optional): Number of worker processes to search for a valid
+            seed with. Defaults to 1, which searches in this process.
 
     Returns:
         None
-    """
-    n_task_types = -1
-    n_event_times = 0
-
-    attempts = 0
-    while n_task_types != n_event_times and attempts < max_attempts:
-        # Generate a random XML file
-        random_xml, n_task_types, n_event_times = matbii_generate_random_xml(
-            random_state=seed, comm_stems_path=None, **params_dict
-        )
-        seed += 1
-        attempts += 1
 
-    if attempts == max_attempts:
+    Note:
+        When ``seed_cache_path`` is given, the first valid seed is recorded there,
+        keyed by the package version, the starting seed and ``params_dict``. Later
+        runs reuse that seed instead of searching again. Otherwise, the seeds after
+        the first one are tried in parallel batches when ``n_workers`` is above 1,
+        which finds the same seed as trying them in order.
+    """
+    random_xml, seed = _generate_valid_xml(
+        seed, params_dict, max_attempts, seed_cache_path, n_workers
+    )
+    if random_xml is None:
         _logger.error("Maximum attempts reached while generating XML.")
         return
+    _save_xml(random_xml, seed, output_folder, condition, version)
 
-    # Save the XML to a file
+
+def _save_xml(
+    random_xml: str, seed: int, output_folder: Path, condition: str, version: str
+) -> None:
     output_folder.mkdir(parents=True, exist_ok=True)
     if (condition == CONDITION_LOW) & (version == VERSION_C):
+        low_params = _get_matbii_params()["MATBII_LOW_PARAMS"]
         file_stem = (
             "MATB_EVENTS_tutorial_"
-            + str(_get_matbii_params()["MATBII_LOW_PARAMS"]["session_duration_minutes"])
+            + str(low_params["session_duration_minutes"])
             + "mins"
             + "_seed_"
             + str(seed)
@@ -96,25 +294,31 @@ def generate_and_save_xml(
 
 
 def _create_matbii_scenarios(
-    condition: str, output_folder: Path, max_attempts: int = MAX_ATTEMPTS
+    condition: str,
+    output_folder: Path,
+    max_attempts: int = MAX_ATTEMPTS,
+    seed_cache_path: Optional[Path] = None,
+    n_workers: int = 1,
 ) -> None:
     seed = 0
 
     params = _get_matbii_params()
     assert "MATBII_HIGH_PARAMS" in params, str(params)
-    if condition == CONDITION_HIGH:
-        params_dict = params["MATBII_HIGH_PARAMS"]
-    elif condition == CONDITION_LOW:
-        params_dict = params["MATBII_LOW_PARAMS"]
-    else:
+    if condition not in _CONDITION_PARAMS_KEYS:
         _logger.error(f"Invalid condition: {condition}")
         return
+    params_dict = params[_CONDITION_PARAMS_KEYS[condition]]
 
-    for version in [VERSION_A, VERSION_B, VERSION_C]:
-        if not ((condition == CONDITION_HIGH) & (version == VERSION_C)):
-            generate_and_save_xml(
-                seed, params_dict, output_folder, condition, version, max_attempts
-            )
+    # Every version of the condition is generated from the same seed and parameters,
+    # so the valid XML is only searched for once and saved for each version
+    random_xml, valid_seed = _generate_valid_xml(
+        seed, params_dict, max_attempts, seed_cache_path, n_workers
+    )
+    if random_xml is None:
+        _logger.error("Maximum attempts reached while generating XML.")
+        return
+    for version in _CONDITION_VERSIONS[condition]:
+        _save_xml(random_xml, valid_seed, output_folder, condition, version)
 
 
 # ---- CLI ----
@@ -142,6 +346,13 @@ def parse_args(args: List[str]) -> argparse.Namespace:
     parser.add_argument(
         dest="output_folder", help="Output folder", type=str, metavar="STR"
     )
+    parser.add_argument(
+        "--seed-cache",
+        dest="seed_cache",
+        help="JSON file remembering the valid seeds between runs",
+        type=str,
+        metavar="STR",
+    )
     parser.add_argument(
         "-v",
         "--verbose",
@@ -161,12 +372,17 @@ def parse_args(args: List[str]) -> argparse.Namespace:
     return parser.parse_args(args)
 
 
-def setup_logging(loglevel: int) -> None:
+def setup_logging(loglevel: Optional[int]) -> None:
     """Setup basic logging
 
+    Nothing is configured when ``loglevel`` is ``None`` (neither ``-v`` nor ``-vv``
+    was given), so the root logger keeps its defaults.
+
     Args:
-      loglevel (int): minimum loglevel for emitting messages
+      loglevel (Optional[int]): minimum loglevel for emitting messages
     """
+    if loglevel is None:
+        return
     logformat = "[%(asctime)s] %(levelname)s:%(name)s:%(message)s"
     logging.basicConfig(
         level=loglevel, stream=sys.stdout, format=logformat, datefmt="%Y-%m-%d %H:%M:%S"
@@ -185,8 +401,18 @@ def main(args: List[str]) -> None:
     parsed_args = parse_args(args)
     setup_logging(parsed_args.loglevel)
     output_folder = Path(parsed_args.output_folder)
-    _create_matbii_scenarios(condition=CONDITION_HIGH, output_folder=output_folder)
-    _create_matbii_scenarios(condition=CONDITION_LOW, output_folder=output_folder)
+    seed_cache_path = (
+        Path(parsed_args.seed_cache) if parsed_args.seed_cache is not None else None
+    )
+    # The command line searches for valid seeds on every CPU it may use
+    n_workers = _get_n_search_workers()
+    for condition in (CONDITION_HIGH, CONDITION_LOW):
+        _create_matbii_scenarios(
+            condition=condition,
+            output_folder=output_folder,
+            seed_cache_path=seed_cache_path,
+            n_workers=n_workers,
+        )
 
     _logger.info("Script ends here")
 
@@ -1,6 +1,6 @@
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
-from xml.etree.ElementTree import Element, SubElement, fromstring, tostring  # noqa S405
+from xml.etree.ElementTree import Element, SubElement, fromstring  # noqa S405
 
 import numpy as np
 
@@ -42,6 +42,25 @@ _INITIAL_XML_STRING_MATBII = """<MATB-EVENTS>
 _N_ATTEMPTS_CHECK_TASK_TIME_COMPLY = 100000
 _GRACE_SECONDS_BEFORE_SESSION_DURATION = 25
 
+# Task types drawn to fill in missing tasks when there are more events than tasks
+_TASK_POOL = np.array(
+    ["resman", "sysmon-light", "sysmon-scale", "comm-own", "comm-other"]
+)
+
+# Integer codes of the task types, used to shuffle and check task orders without
+# string comparisons. The code of a task type is its index in _TASK_TYPES.
+_TASK_TYPES = np.array(
+    ["resman", "comm-own", "comm-other", "sysmon-light", "sysmon-scale"]
+)
+_TASK_TYPE_CODES = {t: code for code, t in enumerate(_TASK_TYPES.tolist())}
+_CODE_RESMAN = _TASK_TYPE_CODES["resman"]
+_CODE_COMM_OWN = _TASK_TYPE_CODES["comm-own"]
+_CODE_COMM_OTHER = _TASK_TYPE_CODES["comm-other"]
+_CODE_SYSMON_LIGHT = _TASK_TYPE_CODES["sysmon-light"]
+_CODE_SYSMON_SCALE = _TASK_TYPE_CODES["sysmon-scale"]
+# Lookup table from task code to whether the task is a communications task
+_IS_COMM_CODE = np.isin(np.arange(len(_TASK_TYPES)), [_CODE_COMM_OWN, _CODE_COMM_OTHER])
+
 
 def _get_comm_stems(comm_stems_path: Optional[str]) -> Dict[str, List[str]]:
     """
@@ -60,15 +79,18 @@ def _get_comm_stems(comm_stems_path: Optional[str]) -> Dict[str, List[str]]:
         dict: A dictionary with call signs as keys ("OWN", "OTHER") and lists of
             communication stems as values.
     """
+    if comm_stems_path is not None:
+        # Walk the folder once and split the stems per call sign below
+        wav_stems = [
+            p.stem
+            for p in Path(comm_stems_path).rglob("*.wav")
+            if len(p.stem.split("_")) == 3
+        ]
     comm_stems_per_ship = {}
     for ship in ["own", "other"]:
         if comm_stems_path is not None:
             current_comm_stems = np.array(
-                [
-                    p.stem
-                    for p in Path(comm_stems_path).rglob("*.wav")
-                    if ship.upper() in p.stem and len(p.stem.split("_")) == 3
-                ]
+                [stem for stem in wav_stems if ship.upper() in stem]
             )
         else:
             current_comm_stems = np.array(_get_matbii_comm_stems()[ship])
@@ -156,13 +178,10 @@ def _adjust_task_types(
     if len(task_types) > len(event_times):
         task_types = task_types[: len(event_times)]
     elif len(task_types) < len(event_times):
-        for _ in range(len(event_times) - len(task_types)):
-            task_types = np.append(
-                task_types,
-                np.random.choice(
-                    ["resman", "sysmon-light", "sysmon-scale", "comm-own", "comm-other"]
-                ),
-            )
+        extra_task_types = np.random.choice(
+            _TASK_POOL, size=len(event_times) - len(task_types)
+        )
+        task_types = np.concatenate([task_types, extra_task_types])
     return task_types, n_task_types, n_event_times
 
 
@@ -196,10 +215,6 @@ def _generate_tasks(
         seconds_after_comm_start (int): How many seconds after the indication of
             starting communication.
     """
-    pump_failed_dict = {}
-    for i in range(9):
-        pump = "P" + str(i)
-        pump_failed_dict[pump] = np.zeros(session_duration_seconds)
     task_times_comply = ensure_task_times_comply(
         task_types,
         event_times,
@@ -209,6 +224,8 @@ def _generate_tasks(
         session_duration_seconds,
     )
     if task_times_comply:
+        # One row per pump P1 to P7, flagging the seconds during which it has failed
+        pump_failed = np.zeros((7, session_duration_seconds), dtype=np.uint8)
         _generate_random_tasks(
             root,
             task_types=task_types,
@@ -216,7 +233,7 @@ def _generate_tasks(
             comm_stems_per_ship=comm_stems_per_ship,
             min_seconds_fail_fix_resman=min_seconds_fail_fix_resman,
             max_seconds_fail_fix_resman=max_seconds_fail_fix_resman,
-            pump_failed_dict=pump_failed_dict,
+            pump_failed=pump_failed,
         )
 
 
@@ -256,7 +273,7 @@ def _generate_auto_and_comm_start_stop(
         session_duration_seconds - total_auto_minutes * 60 - buffer_seconds_auto
     )
     min_seconds_auto = buffer_seconds_auto
-    auto_start_seconds = np.random.choice(np.arange(min_seconds_auto, max_seconds_auto))
+    auto_start_seconds = np.random.randint(min_seconds_auto, max_seconds_auto)
     _generate_auto_task(
         root,
         auto_start_seconds=auto_start_seconds,
@@ -297,10 +314,7 @@ def _finalize_matbii_generation(
     end_event = SubElement(root, "event", startTime=end_time)
     SubElement(end_event, "control").text = "END"
     root = _sort_events_by_seconds(root=root)
-    xml_string = _pretty_format_xml(
-        tostring(root, encoding="utf-8").decode("utf-8"),
-        xml_declaration=xml_declaration,
-    )
+    xml_string = _pretty_format_xml(root, xml_declaration=xml_declaration)
     return xml_string
 
 
@@ -432,10 +446,8 @@ def generate_random_events(
         np.ndarray: The array of event times.
     """
     size = int(np.round(session_duration_seconds / min_seconds_event_diff))
-    event_diffs = np.random.choice(
-        np.arange(min_seconds_event_diff, max_seconds_event_diff),
-        size=size,
-        replace=True,
+    event_diffs = np.random.randint(
+        min_seconds_event_diff, max_seconds_event_diff, size=size
     )
     event_times = np.cumsum(event_diffs)
     event_times = event_times[
@@ -464,12 +476,15 @@ def generate_task_types(
     Returns:
         np.ndarray: The array of task types.
     """
-    task_types_list = ["resman"] * n_pump_failures
-    task_types_list.extend(["comm-own"] * n_own_comm)
-    task_types_list.extend(["comm-other"] * n_other_comm)
-    task_types_list.extend(["sysmon-light"] * n_green_red_issues)
-    task_types_list.extend(["sysmon-scale"] * n_systems_up_down)
-    return np.array(task_types_list)
+    # _TASK_TYPES lists the task types in the order they are counted here
+    task_counts = [
+        n_pump_failures,
+        n_own_comm,
+        n_other_comm,
+        n_green_red_issues,
+        n_systems_up_down,
+    ]
+    return np.repeat(_TASK_TYPES, task_counts)
 
 
 def ensure_task_times_comply(
@@ -484,7 +499,8 @@ def ensure_task_times_comply(
     Ensure task times comply with certain conditions.
 
     Args:
-        task_types (np.ndarray): The array of task types.
+        task_types (np.ndarray): The array of task types, as strings or integer codes.
+            Shuffled in place until the task times comply.
         event_times (np.ndarray): The array of event times.
         seconds_before_comm_stop (int): How many seconds should be before the
             indication of stopping communication.
@@ -497,25 +513,72 @@ def ensure_task_times_comply(
     Returns:
         bool: True if task times comply, False otherwise.
     """
+    task_codes = _encode_task_types(task_types)
+    # Only the order of the tasks changes between attempts, so everything that
+    # depends on the event times alone is computed once
+    is_no_comm_time, is_no_resman_time = _get_restricted_event_times(
+        event_times=event_times,
+        seconds_before_comm_stop=seconds_before_comm_stop,
+        seconds_after_comm_start=seconds_after_comm_start,
+        min_seconds_fail_fix_resman=min_seconds_fail_fix_resman,
+        session_duration_seconds=session_duration_seconds,
+    )
     attempts = 0
     task_times_comply = False
     while not task_times_comply and attempts < _N_ATTEMPTS_CHECK_TASK_TIME_COMPLY:
         # Reshuffle
-        np.random.shuffle(task_types)
-        task_times_comply = _check_task_times_comply(
-            task_types=task_types,
+        np.random.shuffle(task_codes)
+        task_times_comply = _check_task_codes_comply(
+            task_codes=task_codes,
             event_times=event_times,
-            seconds_before_comm_stop=seconds_before_comm_stop,
-            seconds_after_comm_start=seconds_after_comm_start,
-            min_seconds_fail_fix_resman=min_seconds_fail_fix_resman,
-            session_duration_seconds=session_duration_seconds,
+            is_no_comm_time=is_no_comm_time,
+            is_no_resman_time=is_no_resman_time,
             max_repeats=2,
             window_size=3,
         )
         attempts += 1
+    if np.issubdtype(task_types.dtype, np.integer):
+        task_types[:] = task_codes
+    else:
+        task_types[:] = _TASK_TYPES[task_codes]
     return task_times_comply
 
 
+def _encode_task_types(task_types: np.ndarray) -> np.ndarray:
+    """Convert an array of task types into an array of their integer codes.
+
+    Arrays that already hold integer codes are returned as int8 without a copy when
+    possible.
+
+    Args:
+        task_types (np.ndarray): The task types, as strings or integer codes.
+
+    Returns:
+        np.ndarray: The int8 codes of the task types.
+
+    Raises:
+        ValueError: If a task type or task code is unknown.
+    """
+    task_types = np.asarray(task_types)
+    if np.issubdtype(task_types.dtype, np.integer):
+        # Check the range before the cast, which would wrap codes outside of int8
+        is_unknown_code = (task_types < 0) | (task_types >= len(_TASK_TYPES))
+        if is_unknown_code.any():
+            raise ValueError(
+                "Unknown task codes: " + str(np.unique(task_types[is_unknown_code]))
+            )
+        return task_types.astype(np.int8, copy=False)
+    # One vectorized comparison per task type instead of a lookup per element
+    task_codes = np.full(len(task_types), -1, dtype=np.int8)
+    for code, task_type in enumerate(_TASK_TYPES):
+        task_codes[task_types == task_type] = code
+    if (task_codes < 0).any():
+        raise ValueError(
+            "Unknown task types: " + str(np.unique(task_types[task_codes < 0]))
+        )
+    return task_codes
+
+
 def _check_task_times_comply(
     task_types: np.ndarray,
     event_times: np.ndarray,
@@ -529,42 +592,90 @@ def _check_task_times_comply(
     max_repeats: int = 2,
     window_size: int = 3,
 ) -> bool:
-    max_seconds_last_comm = session_duration_seconds - seconds_before_comm_stop
-    should_not_be_comm = list(
-        task_types[np.where(event_times >= max_seconds_last_comm)]
+    # task_types can hold strings or int8 codes, the check itself runs on the codes
+    is_no_comm_time, is_no_resman_time = _get_restricted_event_times(
+        event_times=event_times,
+        seconds_before_comm_stop=seconds_before_comm_stop,
+        seconds_after_comm_start=seconds_after_comm_start,
+        min_seconds_fail_fix_resman=min_seconds_fail_fix_resman,
+        session_duration_seconds=session_duration_seconds,
     )
-    should_not_be_comm.extend(
-        list(task_types[np.where(event_times <= seconds_after_comm_start)])
+    return _check_task_codes_comply(
+        task_codes=_encode_task_types(task_types),
+        event_times=event_times,
+        is_no_comm_time=is_no_comm_time,
+        is_no_resman_time=is_no_resman_time,
+        min_seconds_between_comm=min_seconds_between_comm,
+        min_seconds_between_sysmon_light=min_seconds_between_sysmon_light,
+        min_seconds_between_sysmon_scale=min_seconds_between_sysmon_scale,
+        max_repeats=max_repeats,
+        window_size=window_size,
     )
-    comm_times = event_times[
-        np.where([t in ["comm-own", "comm-other"] for t in task_types])
-    ]
 
-    should_not_be_resman = list(
-        task_types[
-            np.where(
-                event_times
-                >= session_duration_seconds - min_seconds_fail_fix_resman - 1
-            )
-        ]
+
+def _get_restricted_event_times(
+    event_times: np.ndarray,
+    seconds_before_comm_stop: int,
+    seconds_after_comm_start: int,
+    min_seconds_fail_fix_resman: int,
+    session_duration_seconds: int,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Flag the event times at which communications and Resource Management tasks are
+    not allowed.
+
+    Args:
+        event_times (np.ndarray): The array of event times.
+        seconds_before_comm_stop (int): How many seconds should be before the
+            indication of stopping communication.
+        seconds_after_comm_start (int): How many seconds after the indication of
+            starting communication.
+        min_seconds_fail_fix_resman (int): The minimum time difference between the fail
+            and fix tasks in the Resource Management event.
+        session_duration_seconds (int): The duration of the session in seconds.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Boolean masks of the event times that cannot
+            hold a communications task and a Resource Management task, respectively.
+    """
+    max_seconds_last_comm = session_duration_seconds - seconds_before_comm_stop
+    is_no_comm_time = (event_times >= max_seconds_last_comm) | (
+        event_times <= seconds_after_comm_start
     )
+    is_no_resman_time = (
+        event_times >= session_duration_seconds - min_seconds_fail_fix_resman - 1
+    )
+    return is_no_comm_time, is_no_resman_time
 
-    sysmon_light_times = event_times[np.where(task_types == "sysmon-light")]
-    sysmon_scale_times = event_times[np.where(task_types == "sysmon-scale")]
 
-    if np.any([t in ["comm-own", "comm-other"] for t in should_not_be_comm]):
-        return False
-    elif np.any(np.diff(comm_times) < min_seconds_between_comm):
+def _check_task_codes_comply(
+    task_codes: np.ndarray,
+    event_times: np.ndarray,
+    is_no_comm_time: np.ndarray,
+    is_no_resman_time: np.ndarray,
+    min_seconds_between_comm: int = 30,
+    min_seconds_between_sysmon_light: int = 15,
+    min_seconds_between_sysmon_scale: int = 10,
+    max_repeats: int = 2,
+    window_size: int = 3,
+) -> bool:
+    # Cheapest checks first. This runs up to _N_ATTEMPTS_CHECK_TASK_TIME_COMPLY times
+    # per scenario, so it sticks to array methods and slicing, which avoid the
+    # Python-level overhead of np.any and np.diff on these short arrays.
+    is_comm = _IS_COMM_CODE[task_codes]
+    if (is_comm & is_no_comm_time).any():
         return False
-    elif np.any([t == "resman" for t in should_not_be_resman]):
+    if (task_codes[is_no_resman_time] == _CODE_RESMAN).any():
         return False
-    elif np.any(np.diff(sysmon_light_times) < min_seconds_between_sysmon_light):
+    comm_times = event_times[is_comm]
+    if (comm_times[1:] - comm_times[:-1] < min_seconds_between_comm).any():
         return False
-    elif np.any(np.diff(sysmon_scale_times) < min_seconds_between_sysmon_scale):
+    light_times = event_times[task_codes == _CODE_SYSMON_LIGHT]
+    if (light_times[1:] - light_times[:-1] < min_seconds_between_sysmon_light).any():
         return False
-    elif _has_repeated_values(
-        task_types, max_repeats=max_repeats, window_size=window_size
-    ):
+    scale_times = event_times[task_codes == _CODE_SYSMON_SCALE]
+    if (scale_times[1:] - scale_times[:-1] < min_seconds_between_sysmon_scale).any():
         return False
-    else:
-        return True
+    return not _has_repeated_values(
+        task_codes, max_repeats=max_repeats, window_size=window_size
+    )
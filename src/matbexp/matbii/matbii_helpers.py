@@ -1,7 +1,7 @@
-import xml.dom.minidom  # noqa S408
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
-from xml.etree.ElementTree import Element  # noqa S405
+from typing import Dict, Optional, Tuple
+from xml.etree.ElementTree import Element, indent, tostring  # noqa S405
 
 import numpy as np
 from importlib_resources import files
@@ -10,7 +10,10 @@ from matbexp import matbii
 
 from ..misc.utils import import_dict_from_json
 
+_MATBII_PATH = Path(str(files(matbii)))
 
+
+@lru_cache(maxsize=4096)
 def _format_seconds(seconds: int) -> str:
     """
     Converts the total number of seconds into a string representation
@@ -22,13 +25,12 @@ def _format_seconds(seconds: int) -> str:
     Returns:
         str: The formatted time string.
     """
-    hours = seconds // 3600
-    minutes = (seconds % 3600) // 60
-    seconds = seconds % 60
-
+    hours, seconds = divmod(seconds, 3600)
+    minutes, seconds = divmod(seconds, 60)
     return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
 
 
+@lru_cache(maxsize=4096)
 def _parse_time_string(time_string: str) -> int:
     """
     Parses a time string in the format "HH:MM:SS" and returns the total number of
@@ -64,71 +66,49 @@ def _has_repeated_values(array: np.ndarray, max_repeats: int, window_size: int)
     Returns:
         bool: True if the array has repeated values within the window, False otherwise.
     """
-    for i in range(len(array) - window_size + 1):
-        window = array[i : i + window_size]
-        _, counts = np.unique(window, return_counts=True)
-        if np.max(counts) > max_repeats:
-            return True
-    return False
+    if len(array) < window_size:
+        return False
+    # Running count of each distinct value, with a leading row of zeros so that
+    # the counts within window i are counts[i + window_size] - counts[i]
+    _, codes = np.unique(array, return_inverse=True)
+    counts = np.zeros((len(codes) + 1, codes.max() + 1), dtype=np.intp)
+    counts[np.arange(1, len(codes) + 1), codes] = 1
+    np.cumsum(counts, axis=0, out=counts)
+    window_counts = counts[window_size:] - counts[:-window_size]
+    return bool(np.any(window_counts > max_repeats))
 
 
-def _remove_one_level_indent(txt: str, max_indent: int = 10) -> str:
-    """Remove one level of indentation for each line in the text.
-
-    Args:
-        txt (str): The input text with indentation.
-        max_indent (int): The maximum number of indentation levels to consider.
-            Default is 10.
-
-    Returns:
-        str: The modified text with one level of indentation removed from each line.
-    """
-    lines = txt.split("\n")
-    for i in range(len(lines)):
-        indent_removed = False
-        for j in list(reversed(list(np.arange(max_indent)))):
-            original_indent = r"".join(["\t"] * (j + 1))
-            new_indent = r"".join(["\t"] * j)
-            if original_indent in lines[i] and not indent_removed:
-                lines[i] = lines[i].replace(original_indent, new_indent)
-                indent_removed = True
+def _pretty_format_xml(root: Element, xml_declaration: Optional[str] = None) -> str:
+    """Serialize the MATB-II events with one tab of indentation per nesting level.
 
-    modified_txt = "\n".join(lines)
-    return modified_txt
-
-
-def _remove_blank_lines(txt: str) -> str:
-    """Remove blank lines from the given text.
+    Events are written at column zero and their children are indented with tabs,
+    matching the layout MATB-II scenario files use. The whitespace of ``root`` is
+    modified in place.
 
     Args:
-        txt (str): The input text.
+        root (Element): The root element of the XML document.
+        xml_declaration (Optional[str]): The XML declaration to prepend. Default is
+            ``None``, which writes no declaration.
 
     Returns:
-        str: The text with blank lines removed.
+        str: The formatted XML string.
     """
-    lines = txt.splitlines()
-    non_blank_lines = [line for line in lines if line.strip()]
-    return "\n".join(non_blank_lines)
-
-
-def _pretty_format_xml(xml_string: str, xml_declaration: Optional[str] = None) -> str:
-    # Pretty print the XML with tab indentations
-    dom = xml.dom.minidom.parseString(xml_string)  # noqa S318
-    pretty_xml = dom.toprettyxml(indent="\t")
-
+    root.text = "\n"
+    for event in root:
+        indent(event, space="\t")
+        event.tail = "\n"
+    xml_string = tostring(root, encoding="unicode")
     if xml_declaration is not None:
-        current_declaration = pretty_xml.split("\n")[0]
-        pretty_xml = pretty_xml.replace(current_declaration, xml_declaration)
-
-    modified_xml = _remove_one_level_indent(pretty_xml)
-    final_xml = _remove_blank_lines(modified_xml)
-    return final_xml
+        xml_string = xml_declaration + xml_string
+    return xml_string
 
 
-def _get_matbii_comm_stems() -> dict:
-    parent_path = Path(str(files(matbii)))
-    comm_stems_path = Path(parent_path, "matbii_comm_stems.json")
-    return import_dict_from_json(comm_stems_path)
+@lru_cache(maxsize=1)
+def _get_matbii_comm_stems() -> Dict[str, Tuple[str, ...]]:
+    comm_stems_path = Path(_MATBII_PATH, "matbii_comm_stems.json")
+    comm_stems = import_dict_from_json(comm_stems_path)
+    # Tuples, so that the cached stems cannot be modified by callers
+    return {ship: tuple(stems) for ship, stems in comm_stems.items()}
 
 
 def _get_seconds_from_elem(elem: Element) -> int:
@@ -4,7 +4,11 @@ from xml.etree.ElementTree import Comment, Element, SubElement  # noqa S405
 
 import numpy as np
 
-from .matbii_helpers import _format_seconds, _parse_time_string, _sort_events_by_seconds
+from .matbii_helpers import _format_seconds, _parse_time_string
+
+_SYSMON_LIGHT_COLORS = np.array(["GREEN", "RED"])
+_SYSMON_SCALE_NUMBERS = np.array(["ONE", "TWO", "THREE", "FOUR"])
+_SYSMON_SCALE_DIRECTIONS = np.array(["UP", "DOWN"])
 
 
 def _generate_random_tasks(
@@ -14,28 +18,59 @@ def _generate_random_tasks(
     comm_stems_per_ship: dict,
     min_seconds_fail_fix_resman: int,
     max_seconds_fail_fix_resman: int,
-    pump_failed_dict: Optional[dict],
+    pump_failed: Optional[np.ndarray],
 ) -> None:
-    for task_type, event_time in zip(task_types, event_times):
+    # Work on plain Python values rather than NumPy scalars in the loop
+    for task_type, event_time in zip(task_types.tolist(), event_times.tolist()):
         time = _format_seconds(event_time)
+        task_kind, _, task_subtype = task_type.partition("-")
 
         if task_type == "resman":
-            pump_failed_dict = _generate_resman_task(
+            pump_failed = _generate_resman_task(
                 root,
                 time=time,
                 min_seconds_fail_fix=min_seconds_fail_fix_resman,
                 max_seconds_fail_fix=max_seconds_fail_fix_resman,
-                pump_failed_dict=pump_failed_dict,
+                pump_failed=pump_failed,
             )
-        elif task_type.split("-")[0] == "sysmon":
-            sysmon_subtype = task_type.split("-")[1]
-            _generate_sysmon_task(root, time=time, sysmon_subtype=sysmon_subtype)
-        elif task_type.split("-")[0] == "comm":
-            ship = task_type.split("-")[1].upper()
+        elif task_kind == "sysmon":
+            _generate_sysmon_task(root, time=time, sysmon_subtype=task_subtype)
+        elif task_kind == "comm":
+            ship = task_subtype.upper()
             comm_stem = comm_stems_per_ship[ship].pop()
             _generate_comm_task(root, time=time, comm_stem=comm_stem)
 
 
+def _generate_sched_event(
+    root: Element,
+    time: str,
+    task: str,
+    action: str,
+    update: str = "NULL",
+    response: str = "NULL",
+) -> None:
+    """Generate a Sched event and add it to the root.
+
+    Args:
+        root (Element): The parent XML element to add the event to.
+        time (str): The time in the format "HH:MM:SS".
+        task (str): The scheduled task, e.g. ``"COMM"`` or ``"TRACK"``.
+        action (str): The scheduled action, e.g. ``"START"`` or ``"AUTO"``.
+        update (str): The update rate of the task. Default is ``"NULL"``.
+        response (str): The response rate of the task. Default is ``"NULL"``.
+    """
+    event = SubElement(root, "event", startTime=time)
+    event.append(Comment("Sched task"))
+    sched = SubElement(event, "sched")
+    for tag, text in (
+        ("task", task),
+        ("action", action),
+        ("update", update),
+        ("response", response),
+    ):
+        SubElement(sched, tag).text = text
+
+
 def _generate_comm_sched_task(root: Element, time: str, action: str) -> None:
     """Generate a comm Sched task and add it to the event.
 
@@ -44,15 +79,7 @@ def _generate_comm_sched_task(root: Element, time: str, action: str) -> None:
         time (str): The time in the format "HH:MM:SS".
         action (str): ``"START"`` or ``"STOP"``.
     """
-    comment = Comment("Sched task")
-
-    auto_event = SubElement(root, "event", startTime=time)
-    auto_event.append(comment)
-    task = SubElement(auto_event, "sched")
-    SubElement(task, "task").text = "COMM"
-    SubElement(task, "action").text = action
-    SubElement(task, "update").text = "NULL"
-    SubElement(task, "response").text = "NULL"
+    _generate_sched_event(root, time=time, task="COMM", action=action)
 
 
 def _get_comm_task_times(root: Element) -> List[int]:
@@ -66,17 +93,11 @@ def _get_comm_task_times(root: Element) -> List[int]:
     Returns:
         List[int]: A list of timestamps of communication tasks.
     """
-    # Get all event elements
-    event_elements = root.findall("event")
-
-    # Get the timestamps of comm tasks
-    comm_task_times = []
-    for event in event_elements:
-        if event.find("comm") is not None:
-            start_time_str = event.attrib["startTime"]
-            comm_task_times.append(_parse_time_string(start_time_str))
-
-    return comm_task_times
+    # Get the timestamps of the events that have a comm child in a single pass
+    return [
+        _parse_time_string(event.get("startTime"))
+        for event in root.iterfind("event[comm]")
+    ]
 
 
 def _generate_all_comm_start_stop(
@@ -86,9 +107,9 @@ def _generate_all_comm_start_stop(
     seconds_after_comm_start: int = 5,
     session_duration_seconds: int = 600,
 ) -> None:
-    # Get all event elements
-    root = _sort_events_by_seconds(root=root)
-    comm_task_times = _get_comm_task_times(root=root)
+    # Get the comm task times in chronological order. Events are only sorted once,
+    # after every task has been added
+    comm_task_times = sorted(_get_comm_task_times(root=root))
 
     # Get timestamp of first comm task and set initial communication start
     first_comm_task_time = comm_task_times[0]
@@ -158,34 +179,21 @@ def _generate_auto_task(
         session_duration_seconds (int): The duration of the session in seconds. Default
             is 600.
     """
-    comment = Comment("Sched task")
-
-    start_time_auto = _format_seconds(auto_start_seconds)
-    auto_event = SubElement(root, "event", startTime=start_time_auto)
-    auto_event.append(comment)
-    task = SubElement(auto_event, "sched")
-    SubElement(task, "task").text = "TRACK"
-    SubElement(task, "action").text = "AUTO"
-    SubElement(task, "update").text = "NULL"
-    SubElement(task, "response").text = "NULL"
-
-    start_time_manual = _format_seconds(auto_start_seconds + total_auto_minutes * 60)
-    manual_event = SubElement(root, "event", startTime=start_time_manual)
-    manual_event.append(comment)
-    task = SubElement(manual_event, "sched")
-    SubElement(task, "task").text = "TRACK"
-    SubElement(task, "action").text = "MANUAL"
-    SubElement(task, "update").text = "MEDIUM"
-    SubElement(task, "response").text = "HIGH"
-
-    start_time_auto = _format_seconds(session_duration_seconds - 3)
-    auto_event = SubElement(root, "event", startTime=start_time_auto)
-    auto_event.append(comment)
-    task = SubElement(auto_event, "sched")
-    SubElement(task, "task").text = "TRACK"
-    SubElement(task, "action").text = "AUTO"
-    SubElement(task, "update").text = "NULL"
-    SubElement(task, "response").text = "NULL"
+    # Tracking is automatic from the start time, manual for total_auto_minutes, then
+    # automatic again just before the end of the session
+    for seconds, action, update, response in (
+        (auto_start_seconds, "AUTO", "NULL", "NULL"),
+        (auto_start_seconds + total_auto_minutes * 60, "MANUAL", "MEDIUM", "HIGH"),
+        (session_duration_seconds - 3, "AUTO", "NULL", "NULL"),
+    ):
+        _generate_sched_event(
+            root,
+            time=_format_seconds(seconds),
+            task="TRACK",
+            action=action,
+            update=update,
+            response=response,
+        )
 
 
 def _generate_resman_task(
@@ -193,8 +201,8 @@ def _generate_resman_task(
     time: str,
     min_seconds_fail_fix: int = 20,
     max_seconds_fail_fix: int = 90,
-    pump_failed_dict: Optional[dict] = None,
-) -> Optional[dict]:
+    pump_failed: Optional[np.ndarray] = None,
+) -> Optional[np.ndarray]:
     """Generate a random Resource Management task and add it to the event.
 
     Args:
@@ -204,29 +212,39 @@ def _generate_resman_task(
             fix tasks in seconds.
         max_seconds_fail_fix (int): The maximum time difference between the fail and
             fix tasks in seconds.
-        pump_failed_dict (Optional[dict]): Dictionary tracking whether pump has failed
-            already.
+        pump_failed (Optional[np.ndarray]): Array of shape
+            ``(7, session_duration_seconds)`` flagging the seconds during which each
+            pump ``P1`` to ``P7`` has already failed. Updated in place.
 
     Returns:
-        Optional[dict]: A dictionary with the pump statuses, or None if no dictionary
+        Optional[np.ndarray]: The array with the pump statuses, or None if no array
             was provided.
+
+    Raises:
+        ValueError: If every pump has already failed during the drawn interval.
     """
-    if pump_failed_dict is not None:
-        need_to_select_pump = True
-        fix_time_seconds = len(pump_failed_dict["P1"])
-        while fix_time_seconds >= len(pump_failed_dict["P1"]) - 1:
-            diff_seconds_fail_fix = np.random.choice(
-                np.arange(min_seconds_fail_fix, max_seconds_fail_fix)
+    if pump_failed is not None:
+        session_duration_seconds = pump_failed.shape[1]
+        fail_time_seconds = _parse_time_string(time)
+        fix_time_seconds = session_duration_seconds
+        while fix_time_seconds >= session_duration_seconds - 1:
+            diff_seconds_fail_fix = np.random.randint(
+                min_seconds_fail_fix, max_seconds_fail_fix
             )
-            fail_time_seconds = _parse_time_string(time)
             fix_time_seconds = diff_seconds_fail_fix + fail_time_seconds
         fix_time = _format_seconds(fix_time_seconds)
-        while need_to_select_pump:
-            pump = "P" + str(np.random.randint(1, 8))
-            # If pump did not already fail
-            if np.all(pump_failed_dict[pump][fail_time_seconds:fix_time_seconds] == 0):
-                pump_failed_dict[pump][fail_time_seconds:fix_time_seconds] = 1
-                need_to_select_pump = False
+        # Check once which pumps did not already fail during the interval
+        failed_during_interval = pump_failed[:, fail_time_seconds:fix_time_seconds]
+        is_pump_available = ~failed_during_interval.any(axis=1)
+        if not is_pump_available.any():
+            raise ValueError(
+                "No pump is available to fail at " + time + " until " + fix_time
+            )
+        pump_number = np.random.randint(1, 8)
+        while not is_pump_available[pump_number - 1]:
+            pump_number = np.random.randint(1, 8)
+        pump_failed[pump_number - 1, fail_time_seconds:fix_time_seconds] = 1
+        pump = "P" + str(pump_number)
     else:
         pump = "P" + str(np.random.randint(1, 8))
 
@@ -241,7 +259,7 @@ def _generate_resman_task(
     event_fix.append(comment_fix)
     resman_fix = SubElement(event_fix, "resman")
     SubElement(resman_fix, "fix").text = pump
-    return pump_failed_dict
+    return pump_failed
 
 
 def _generate_sysmon_task(
@@ -260,16 +278,16 @@ def _generate_sysmon_task(
     event.append(comment)
     sysmon = SubElement(event, "sysmon")
     if sysmon_subtype == "light":
-        color = np.random.choice(["GREEN", "RED"])
+        color = np.random.choice(_SYSMON_LIGHT_COLORS)
         SubElement(sysmon, "monitoringLightType").text = color
         if color == "GREEN":
             sysmon.set("activity", "START")
     else:
         SubElement(sysmon, "monitoringScaleNumber").text = np.random.choice(
-            ["ONE", "TWO", "THREE", "FOUR"]
+            _SYSMON_SCALE_NUMBERS
         )
         SubElement(sysmon, "monitoringScaleDirection").text = np.random.choice(
-            ["UP", "DOWN"]
+            _SYSMON_SCALE_DIRECTIONS
         )
 
 
@@ -284,10 +302,9 @@ def _generate_comm_task(root: Element, time: str, comm_stem: str) -> None:
     event = SubElement(root, "event", startTime=time)
     comment = Comment("Communications task")
     event.append(comment)
-    split_comm_stem = comm_stem.split("_")
-    ship = split_comm_stem[0]
-    radio = split_comm_stem[1]
-    freq = split_comm_stem[2].split("-")[0] + "." + split_comm_stem[2].split("-")[1]
+    ship, radio, freq_code = comm_stem.split("_")[:3]
+    freq_integer, _, freq_decimal = freq_code.partition("-")
+    freq = freq_integer + "." + freq_decimal
     comm = SubElement(event, "comm")
     SubElement(comm, "ship").text = ship
     SubElement(comm, "radio").text = radio
@@ -1,27 +1,54 @@
 import json
-from collections import OrderedDict
 from json.decoder import JSONDecodeError
 from pathlib import Path
-from typing import Union
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+def _loads_json(data: Union[str, bytes]) -> Any:
+    """Deserialize a JSON document, with orjson when it is installed.
+
+    Args:
+        data (Union[str, bytes]): The JSON document, as text or UTF-8 bytes.
+
+    Returns:
+        Any: The deserialized JSON document.
+
+    Raises:
+        JSONDecodeError: If the document is not valid JSON.
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # The standard library also accepts NaN and Infinity
+            pass
+    return json.loads(data)
 
 
 def import_dict_from_json(import_path: Union[str, Path]) -> dict:
-    """Export a dictionary to a JSON file.
+    """Import a dictionary from a JSON file.
 
     Args:
         import_path (Union[str, Path]): The path to the json file.
             Should end in ``.json``.
 
     Returns:
-        dict: The contents of the imported JSON file.
+        dict: The contents of the imported JSON file, or ``{"data": <file text>}``
+            if the file does not contain a JSON object.
     """
-    with open(import_path) as f:
-        data = f.read()
+    # Both JSON decoders read UTF-8 bytes directly, the text is only decoded when
+    # the file does not contain a JSON object
+    data = Path(import_path).read_bytes()
     try:
-        data_dict = json.loads(data, object_pairs_hook=OrderedDict)
+        data_dict = _loads_json(data)
     except JSONDecodeError:
-        data_dict = data
+        data_dict = None
     if isinstance(data_dict, dict):
         return data_dict
     else:
-        return {"data": data}
+        return {"data": data.decode("utf-8")}
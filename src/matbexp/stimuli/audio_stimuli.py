@@ -17,7 +17,7 @@ def generate_transition(duration: float, sampling_rate: int = 44100) -> np.ndarr
 
     """
     num_samples = int(duration * sampling_rate)
-    ramp = np.linspace(0, 1, num_samples)
+    ramp = np.linspace(0, 1, num_samples, dtype=np.float32)
     return ramp
 
 
@@ -33,7 +33,7 @@ def generate_silence(duration: float, sampling_rate: int = 44100) -> np.ndarray:
 
     """
     num_samples = int(duration * sampling_rate)
-    silence = np.zeros(num_samples)
+    silence = np.zeros(num_samples, dtype=np.float32)
     return silence
 
 
@@ -65,35 +65,66 @@ def merge_wav_files(
     if sound_file_names is not None:
         files = [f for f in files if Path(f).name in sound_file_names]
 
-    audio_list = []
+    # Sounds and lengths of the silence that follows them, in merge order
+    segments = []
+    merged_length = 0
     longer_than_total_duration = False
     rng = np.random.default_rng(seed=random_state)
+    # 16-bit audio of each file already read, with the transition applied, as the
+    # same files are drawn again
+    audio_per_file = {}
+    # Transition ramp per sample rate, shared by all files with that sample rate
+    transition_per_sample_rate = {}
 
     while not longer_than_total_duration:
         file = rng.choice(files)
-        sample_rate, audio = wavfile.read(file)
-
-        # Normalize the audio to the range [-1, 1]
-        audio = np.array(audio).astype(np.float32) / np.iinfo(np.array(audio).dtype).max
-
-        # Generate transition and silence durations
-        transition = generate_transition(transition_duration, sampling_rate=sample_rate)
+        if file not in audio_per_file:
+            sample_rate, audio = wavfile.read(file)
+
+            # Normalize the audio to the range [-1, 1]. Floating-point WAV files are
+            # already in this range
+            source_dtype = audio.dtype
+            audio = audio.astype(np.float32, copy=False)
+            if np.issubdtype(source_dtype, np.integer):
+                audio /= np.iinfo(source_dtype).max
+
+            # Apply transition to audio
+            if sample_rate not in transition_per_sample_rate:
+                transition_per_sample_rate[sample_rate] = generate_transition(
+                    transition_duration, sampling_rate=sample_rate
+                )
+            transition = transition_per_sample_rate[sample_rate]
+            audio[: len(transition)] *= transition
+
+            # Scale in double precision before converting to 16-bit integers, as
+            # float32 products can land just below the original integer samples and
+            # be truncated
+            audio = np.multiply(audio, np.iinfo(np.int16).max, dtype=np.float64)
+            audio_per_file[file] = (sample_rate, audio.astype(np.int16))
+        sample_rate, audio = audio_per_file[file]
+
+        # Generate silence duration
         silence_duration = rng.uniform(*silence_range)
-        silence = generate_silence(silence_duration, sampling_rate=sample_rate)
+        silence_length = int(silence_duration * sample_rate)
 
-        # Apply transition and silence to audio
-        transition_length = len(transition)
-        audio[:transition_length] *= transition
-
-        audio = np.concatenate((audio, silence))
-        audio_list.append(audio)
-        merged_audio = np.concatenate(audio_list)
-        if len(merged_audio) > total_duration_minutes * 60 * sample_rate:
+        # Add audio followed by silence
+        segments.append((audio, silence_length))
+        # Track the merged length so the output is only allocated once at the end
+        merged_length += len(audio) + silence_length
+        if merged_length > total_duration_minutes * 60 * sample_rate:
             longer_than_total_duration = True
 
-    merged_audio = (merged_audio * np.iinfo(np.int16).max).astype(np.int16)
-
-    merged_audio = merged_audio[: int(total_duration_minutes * 60 * sample_rate)]
+    # Copy the sounds into the silent output, trimmed to the desired duration
+    merged_audio = np.zeros(
+        int(total_duration_minutes * 60 * sample_rate), dtype=np.int16
+    )
+    position = 0
+    for audio, silence_length in segments:
+        if position >= len(merged_audio):
+            break
+        audio = audio[: len(merged_audio) - position]
+        merged_audio[position : position + len(audio)] = audio
+        position += len(audio) + silence_length
 
     # Create parent directory of output path if it does not exist
     Path(output_file).parent.mkdir(parents=True, exist_ok=True)
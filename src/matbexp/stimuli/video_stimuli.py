@@ -1,8 +1,9 @@
 from pathlib import Path
 from typing import Any, Callable, Optional, Tuple, Union
+from warnings import warn
 
 import numpy as np
-from moviepy.editor import ImageSequenceClip
+from moviepy.editor import VideoClip
 from PIL import Image, ImageDraw
 
 
@@ -69,6 +70,9 @@ def chunked_operation(
     """
     Perform an operation on a NumPy array in chunks.
 
+    Deprecated: ``generate_fixation_video`` no longer uses this function, which will
+    be removed in a future version.
+
     Args:
         arr (numpy.ndarray): The input NumPy array.
         func (Callable[[np.ndarray, Any], np.ndarray]):
@@ -81,6 +85,11 @@ def chunked_operation(
     Returns:
         numpy.ndarray: The modified NumPy array.
     """
+    warn(
+        "chunked_operation is deprecated and will be removed in a future version",
+        DeprecationWarning,
+        stacklevel=2,
+    )
     num_chunks = len(arr) // chunk_size
 
     for i in range(num_chunks):
@@ -100,6 +109,9 @@ def apply_opacity(chunk: np.ndarray, current_opacity: float) -> np.ndarray:
     """
     Apply opacity to a chunk of a NumPy array.
 
+    Deprecated: ``generate_fixation_video`` no longer uses this function, which will
+    be removed in a future version.
+
     Args:
         chunk (numpy.ndarray): The input chunk of the NumPy array.
         current_opacity (float): The opacity value.
@@ -107,27 +119,52 @@ def apply_opacity(chunk: np.ndarray, current_opacity: float) -> np.ndarray:
     Returns:
         numpy.ndarray: The modified chunk after applying opacity.
     """
+    warn(
+        "apply_opacity is deprecated and will be removed in a future version",
+        DeprecationWarning,
+        stacklevel=2,
+    )
     return chunk * (current_opacity / 255)
 
 
-def generate_fixation_video(
-    fixation_image: Image,
-    output_path: Union[str, Path],
-    duration: int = 360,
-    frame_rate: int = 30,
-    fade_seconds: Optional[float] = None,
-) -> None:
+def _fade_frame(
+    frame: np.ndarray, opacity: int, product: np.ndarray, out: np.ndarray
+) -> np.ndarray:
     """
-    Generate a video with a fading fixation cross effect.
+    Scale an 8-bit frame by an integer opacity, with integer arithmetic only.
+
+    Args:
+        frame (numpy.ndarray): The 8-bit frame.
+        opacity (int): The opacity value, from 0 to 255.
+        product (numpy.ndarray): A 16-bit buffer of the frame shape, overwritten with
+            the intermediate product.
+        out (numpy.ndarray): An 8-bit buffer of the frame shape, overwritten with the
+            faded frame.
+
+    Returns:
+        numpy.ndarray: ``out``, holding ``frame * opacity // 255``.
+    """
+    # The product of two 8-bit values fits in 16 bits
+    np.multiply(frame, np.uint16(opacity), out=product)
+    product //= 255
+    np.copyto(out, product, casting="unsafe")
+    return out
+
+
+def _get_fade_opacities(
+    duration: int, frame_rate: int, fade_seconds: Optional[float]
+) -> np.ndarray:
+    """
+    Calculate the opacity of every frame of a video fading out at the end.
 
     Args:
-        fixation_image (Image): The fixation cross image.
-        output_path (Union[str, Path]): The path to save the generated video.
         duration (int): The duration of the video in seconds.
         frame_rate (int): The frame rate of the video.
-        fade_seconds (float): The time (in seconds) when the fade effect should start.
-            Defaults to None.
+        fade_seconds (Optional[float]): The duration (in seconds) of the fade out, or
+            None to fade out over the whole video.
 
+    Returns:
+        np.ndarray: The integer opacity of every frame, from 0 to 255.
     """
     # Calculate the total number of frames in the video
     total_frames = duration * frame_rate
@@ -137,38 +174,94 @@ def generate_fixation_video(
         int((duration - fade_seconds) * frame_rate) if fade_seconds else 0
     )
 
-    # Create a list to store the frames
-    frames = []
+    # Calculate the opacity of every frame for the fade effect
+    frame_counts = np.arange(total_frames)
+    opacity_step = 255 / (total_frames - fade_frame_count)
+    opacities_float = 255 - (frame_counts - fade_frame_count) * opacity_step
+    opacities_initial = opacities_float.astype(int)
 
-    for frame_count in range(total_frames):
-        # Calculate current opacity for the fade effect
-        current_opacity_initial = int(
-            255
-            - (
-                (frame_count - fade_frame_count)
-                * (255 / (total_frames - fade_frame_count))
-            )
-        )
+    # Clip the opacity values to ensure they stay within the valid range
+    return np.clip(opacities_initial, 0, 255)
 
-        # Clip the opacity value to ensure it stays within the valid range
-        current_opacity = max(0, min(current_opacity_initial, 255))
 
-        # Create a new frame with the fixation cross image
-        frame = Image.new("RGBA", fixation_image.size, (0, 0, 0, 0))
-        frame.paste(fixation_image, (0, 0))
-        np_frame = np.array(frame)
+def _make_fade_frame_function(
+    np_frame: np.ndarray, opacities: np.ndarray, frame_rate: int
+) -> Callable[[float], np.ndarray]:
+    """
+    Create the function returning the frame shown at a given time of a fade.
 
-        # Apply the current opacity to the frame
-        result_frame = chunked_operation(
-            np_frame, apply_opacity, chunk_size=3, current_opacity=current_opacity
-        )
+    Args:
+        np_frame (numpy.ndarray): The 8-bit base frame.
+        opacities (numpy.ndarray): The integer opacity of every frame, from 0 to 255.
+        frame_rate (int): The frame rate of the video.
 
-        # Append the frame to the list
-        frames.append(result_frame)
+    Returns:
+        Callable[[float], np.ndarray]: The function returning the frame at time ``t``
+            in seconds. The returned array is only valid until the next call.
+    """
+    total_frames = len(opacities)
+    # The faded frames are written into the same buffers, as moviepy sends each frame
+    # to ffmpeg before requesting the next one
+    product_buffer = np.empty(np_frame.shape, dtype=np.uint16)
+    frame_buffer = np.empty_like(np_frame)
+    # Opacity of the frame held in frame_buffer. Long fades keep the same opacity
+    # over consecutive frames, which can then be sent again without recomputing
+    buffer_opacity = None
+
+    def make_frame(t: float) -> np.ndarray:
+        nonlocal buffer_opacity
+        # Apply the opacity of the frame shown at time t to the base frame
+        frame_count = min(int(round(t * frame_rate)), total_frames - 1)
+        opacity = opacities[frame_count]
+        # Frames before the fade are the unchanged base frame
+        if opacity == 255:
+            return np_frame
+        if opacity != buffer_opacity:
+            _fade_frame(np_frame, opacity, product_buffer, frame_buffer)
+            buffer_opacity = opacity
+        return frame_buffer
+
+    return make_frame
 
-    # Create a video clip from the frames
-    clip = ImageSequenceClip(frames, fps=frame_rate)
+
+def generate_fixation_video(
+    fixation_image: Image,
+    output_path: Union[str, Path],
+    duration: int = 360,
+    frame_rate: int = 30,
+    fade_seconds: Optional[float] = None,
+    codec: str = "libx264",
+    preset: str = "medium",
+) -> None:
+    """
+    Generate a video with a fading fixation cross effect.
+
+    Args:
+        fixation_image (Image): The fixation cross image.
+        output_path (Union[str, Path]): The path to save the generated video.
+        duration (int): The duration of the video in seconds.
+        frame_rate (int): The frame rate of the video.
+        fade_seconds (Optional[float]): The duration (in seconds) of the fade out at
+            the end of the video. Defaults to None, which fades the fixation cross out
+            over the whole video.
+        codec (str): The FFmpeg video encoder, e.g. ``"h264_nvenc"`` to encode on an
+            NVIDIA GPU. Defaults to ``"libx264"``.
+        preset (str): The encoder speed preset, e.g. ``"ultrafast"`` to encode faster
+            at the cost of a larger file. Defaults to ``"medium"``.
+
+    """
+    opacities = _get_fade_opacities(duration, frame_rate, fade_seconds)
+
+    # Read the fixation cross image once, as it never changes. Only the RGB channels
+    # are written to the video
+    np_frame = np.asarray(fixation_image.convert("RGB"), dtype=np.uint8)
+    make_frame = _make_fade_frame_function(np_frame, opacities, frame_rate)
+
+    # Create a video clip that renders each frame only when the encoder requests it
+    clip = VideoClip(make_frame, duration=len(opacities) / frame_rate)
 
     # Save the video to the specified output path
     Path(output_path).parent.mkdir(parents=True, exist_ok=True)
-    clip.write_videofile(str(output_path), codec="libx264", threads=4)
+    clip.write_videofile(
+        str(output_path), fps=frame_rate, codec=codec, preset=preset, threads=4
+    )
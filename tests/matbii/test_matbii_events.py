@@ -1,12 +1,26 @@
+import json
 import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Any, List
 
 import numpy as np
 import pytest
 from pytest import TempPathFactory
 
-from matbexp.gen_matbii_events import _create_matbii_scenarios
-from matbexp.matbii.matbii_events import _check_task_times_comply
+from matbexp import __version__, gen_matbii_events
+from matbexp.gen_matbii_events import (
+    _create_matbii_scenarios,
+    _get_matbii_params,
+    _get_seed_cache_key,
+    _search_valid_xml,
+    generate_and_save_xml,
+)
+from matbexp.matbii.matbii_events import (
+    _check_task_times_comply,
+    _encode_task_types,
+    ensure_task_times_comply,
+)
 
 
 class TestMatbiiGenerateRandomXml:
@@ -17,20 +31,9 @@ class TestMatbiiGenerateRandomXml:
 
     @staticmethod
     def _test_xml_same(xml1: str, xml2: str) -> None:
-        # Parse the XML documents into ElementTree objects
-        tree1 = ET.fromstring(xml1)
-        tree2 = ET.fromstring(xml2)
-
-        # Compare the root tag
-        assert tree1.tag == tree2.tag
-
-        # Compare the number of child elements
-        assert len(tree1) == len(tree2)
-
-        # Compare each child element
-        for child1, child2 in zip(tree1, tree2):
-            assert child1.tag == child2.tag
-            assert child1.text == child2.text
+        # Compare the canonical forms, which covers tags, attributes, text and nesting
+        # at every depth
+        assert ET.canonicalize(xml1) == ET.canonicalize(xml2)
 
     @staticmethod
     @pytest.fixture(scope="session")
@@ -78,125 +81,271 @@ class TestMatbiiGenerateRandomXml:
         )
 
         # Match generated and expected XML files by their file names
-        generated_xml_files = [
-            xml_path
+        generated_xml_files = {
+            xml_path.stem: xml_path
             for xml_path in generated_output_file_parent_path.rglob("*.xml")
             if "MATB_EVENTS" in xml_path.name
+        }
+        matched_files = [
+            (expected_xml_file, generated_xml_files[expected_xml_file.stem])
+            for expected_xml_file in expected_xml_files
+            if expected_xml_file.stem in generated_xml_files
         ]
-        for expected_xml_file in expected_xml_files:
-            matched_files = [
-                generated_xml_file
-                for generated_xml_file in generated_xml_files
-                if expected_xml_file.stem == generated_xml_file.stem
-            ]
-            if matched_files:
-                with open(expected_xml_file, "r") as file:
-                    expected_xml = file.read()
-                with open(matched_files[0], "r") as file:
-                    generated_xml = file.read()
+
+        # Read the matched files concurrently
+        with ThreadPoolExecutor() as executor:
+            matched_xmls = executor.map(
+                lambda files: (files[0].read_text(), files[1].read_text()),
+                matched_files,
+            )
+            for expected_xml, generated_xml in matched_xmls:
                 # Confirm that they are the same with self._test_xml_same()
                 self._test_xml_same(expected_xml, generated_xml)
 
 
-def test_check_task_times_comply() -> None:
+def test_generate_and_save_xml_numpy_params(tmp_path: Path) -> None:
     """
-    Test the compliance of task times in different scenarios.
+    Test that parameters holding NumPy scalars are passed to the generator as given.
 
-    Raises:
-        AssertionError: If the task times do not comply with the expected behavior.
+    Args:
+        tmp_path (Path): Temporary path provided by pytest.
     """
-    # Check should fail due to comm start being too late
-    # relative to the end of the session
-    task_types = np.array(
-        [
-            "resman",
-            "sysmon-light",
-            "sysmon-scale",
-            "resman",
-            "comm-other",
-            "sysmon-scale",
-        ]
-    )
-    event_times = np.array([5, 20, 40, 50, 75, 80])
-    seconds_before_comm_stop = 30
-    seconds_after_comm_start = 5
-    session_duration_seconds = 90
-    min_seconds_fail_fix_resman = 20
-    assert (
-        _check_task_times_comply(
-            task_types=task_types,
-            event_times=event_times,
-            seconds_before_comm_stop=seconds_before_comm_stop,
-            seconds_after_comm_start=seconds_after_comm_start,
-            session_duration_seconds=session_duration_seconds,
-            min_seconds_fail_fix_resman=min_seconds_fail_fix_resman,
-        )
-        is False
+    params_dict = dict(_get_matbii_params()["MATBII_LOW_PARAMS"])
+    params_dict["session_duration_minutes"] = np.int64(
+        params_dict["session_duration_minutes"]
     )
+    generate_and_save_xml(0, params_dict, tmp_path, "low", "a")
+    assert (tmp_path / "MATB_EVENTS_low_a_seed_1.xml").is_file()
 
-    # Check should fail due to comm tasks being too close together
-    task_types = np.array(
-        [
-            "resman",
-            "sysmon-scale",
-            "comm-own",
-            "comm-other",
-            "sysmon-light",
-            "sysmon-scale",
-        ]
+
+def _fail_search(*args: Any, **kwargs: Any) -> None:
+    raise AssertionError("The seed cache should have been used")
+
+
+def _fail_pool(*args: Any, **kwargs: Any) -> None:
+    raise AssertionError("The first seed should have been tried in this process")
+
+
+def test_generate_and_save_xml_seed_cache(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """
+    Test that a warm seed cache reproduces the XML file of a cold run without search.
+
+    Args:
+        tmp_path (Path): Temporary path provided by pytest.
+        monkeypatch (pytest.MonkeyPatch): Pytest fixture for patching the search.
+    """
+    params_dict = _get_matbii_params()["MATBII_LOW_PARAMS"]
+    output_folder = tmp_path / "output"
+    seed_cache_path = tmp_path / "seed_cache.json"
+    generate_and_save_xml(
+        0, params_dict, output_folder, "low", "a", seed_cache_path=seed_cache_path
     )
-    event_times = np.array([5, 20, 40, 50, 60, 80])
-    seconds_before_comm_stop = 30
-    seconds_after_comm_start = 5
-    session_duration_seconds = 90
-    assert (
-        _check_task_times_comply(
-            task_types=task_types,
-            event_times=event_times,
-            seconds_before_comm_stop=seconds_before_comm_stop,
-            seconds_after_comm_start=seconds_after_comm_start,
-            session_duration_seconds=session_duration_seconds,
-            min_seconds_fail_fix_resman=min_seconds_fail_fix_resman,
-        )
-        is False
+    assert seed_cache_path.is_file()
+    (cold_xml_file,) = output_folder.iterdir()
+    cold_xml = cold_xml_file.read_text()
+    cold_xml_file.unlink()
+
+    monkeypatch.setattr(gen_matbii_events, "_search_valid_xml", _fail_search)
+    generate_and_save_xml(
+        0, params_dict, output_folder, "low", "a", seed_cache_path=seed_cache_path
     )
+    (warm_xml_file,) = output_folder.iterdir()
+    assert warm_xml_file.name == cold_xml_file.name
+    assert warm_xml_file.read_text() == cold_xml
 
-    # Check should fail due to sysmon-light tasks being too close together
-    task_types = np.array(
-        ["resman", "sysmon-light", "sysmon-light", "comm-own", "sysmon-scale"]
+
+@pytest.mark.parametrize(
+    "cache_version, cache_entry",
+    [(__version__, 8), ("0.0.0", {"valid_seed": 8})],
+    ids=["old-format", "other-version"],
+)
+def test_generate_and_save_xml_stale_seed_cache(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    cache_version: str,
+    cache_entry: Any,
+) -> None:
+    """
+    Test that seed cache entries of another format or package version are ignored.
+
+    Args:
+        tmp_path (Path): Temporary path provided by pytest.
+        monkeypatch (pytest.MonkeyPatch): Pytest fixture for patching the version.
+        cache_version (str): The package version the entry was written with.
+        cache_entry (Any): The seed cache entry for seed 0, pointing to the valid seed
+            8 while seed 0 is the first valid seed.
+    """
+    params_dict = _get_matbii_params()["MATBII_LOW_PARAMS"]
+    seed_cache_path = tmp_path / "seed_cache.json"
+    with monkeypatch.context() as version_patch:
+        version_patch.setattr(gen_matbii_events, "__version__", cache_version)
+        stale_cache_key = _get_seed_cache_key(0, params_dict)
+    seed_cache_path.write_text(json.dumps({stale_cache_key: cache_entry}))
+
+    generate_and_save_xml(
+        0, params_dict, tmp_path, "low", "a", seed_cache_path=seed_cache_path
     )
-    event_times = np.array([5, 20, 30, 50, 60])
-    seconds_before_comm_stop = 30
-    seconds_after_comm_start = 5
-    session_duration_seconds = 90
-    assert (
-        _check_task_times_comply(
-            task_types=task_types,
-            event_times=event_times,
-            seconds_before_comm_stop=seconds_before_comm_stop,
-            seconds_after_comm_start=seconds_after_comm_start,
-            session_duration_seconds=session_duration_seconds,
-            min_seconds_fail_fix_resman=min_seconds_fail_fix_resman,
+    assert (tmp_path / "MATB_EVENTS_low_a_seed_1.xml").is_file()
+    seed_cache = json.loads(seed_cache_path.read_text())
+    assert seed_cache[_get_seed_cache_key(0, params_dict)] == {"valid_seed": 0}
+
+
+@pytest.mark.parametrize(
+    "seed, n_seeds, expected_seed",
+    [(75, 10, 80), (70, 5, -1)],
+    ids=["valid-seed", "no-valid-seed"],
+)
+def test_search_valid_xml_parallel(seed: int, n_seeds: int, expected_seed: int) -> None:
+    """
+    Test that searching seeds in worker processes finds the same seed as in order.
+
+    Args:
+        seed (int): First seed to try.
+        n_seeds (int): Number of consecutive seeds to try.
+        expected_seed (int): The first valid high condition seed, or ``-1`` if none
+            of the seeds is valid.
+    """
+    params_dict = _get_matbii_params()["MATBII_HIGH_PARAMS"]
+    results = [
+        _search_valid_xml(seed, n_seeds, params_dict, n_workers=n_workers)
+        for n_workers in (1, 3)
+    ]
+    (sequential_xml, sequential_seed), (parallel_xml, parallel_seed) = results
+    assert sequential_seed == parallel_seed == expected_seed
+    assert sequential_xml == parallel_xml
+    assert (parallel_xml is None) == (expected_seed == -1)
+
+
+def test_search_valid_xml_first_seed_in_process(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """
+    Test that a valid first seed is found without starting worker processes.
+
+    Args:
+        monkeypatch (pytest.MonkeyPatch): Pytest fixture for patching the process
+            pool.
+    """
+    params_dict = _get_matbii_params()["MATBII_LOW_PARAMS"]
+    monkeypatch.setattr(gen_matbii_events, "ProcessPoolExecutor", _fail_pool)
+    random_xml, valid_seed = _search_valid_xml(0, 10, params_dict, n_workers=3)
+    assert random_xml is not None
+    assert valid_seed == 0
+
+
+@pytest.mark.parametrize(
+    "task_types, event_times, expected",
+    [
+        # Check should fail due to comm start being too late
+        # relative to the end of the session
+        (
+            [
+                "resman",
+                "sysmon-light",
+                "sysmon-scale",
+                "resman",
+                "comm-other",
+                "sysmon-scale",
+            ],
+            [5, 20, 40, 50, 75, 80],
+            False,
+        ),
+        # Check should fail due to comm tasks being too close together
+        (
+            [
+                "resman",
+                "sysmon-scale",
+                "comm-own",
+                "comm-other",
+                "sysmon-light",
+                "sysmon-scale",
+            ],
+            [5, 20, 40, 50, 60, 80],
+            False,
+        ),
+        # Check should fail due to sysmon-light tasks being too close together
+        (
+            ["resman", "sysmon-light", "sysmon-light", "comm-own", "sysmon-scale"],
+            [5, 20, 30, 50, 60],
+            False,
+        ),
+        # Check should pass
+        (
+            ["resman", "sysmon-light", "sysmon-scale", "comm-own", "sysmon-scale"],
+            [5, 20, 40, 50, 60],
+            True,
+        ),
+    ],
+    ids=["late-comm", "close-comms", "close-sysmon-lights", "comply"],
+)
+def test_check_task_times_comply(
+    task_types: List[str], event_times: List[int], expected: bool
+) -> None:
+    """
+    Test the compliance of task times in different scenarios.
+
+    Args:
+        task_types (List[str]): The task types, in event order.
+        event_times (List[int]): The event times in seconds.
+        expected (bool): Whether the task times should comply.
+
+    Raises:
+        AssertionError: If the task times do not comply with the expected behavior.
+    """
+    # The task types can be given as strings or as their int8 codes
+    for task_types_array in (
+        np.array(task_types),
+        _encode_task_types(np.array(task_types)),
+    ):
+        assert (
+            _check_task_times_comply(
+                task_types=task_types_array,
+                event_times=np.array(event_times),
+                seconds_before_comm_stop=30,
+                seconds_after_comm_start=5,
+                session_duration_seconds=90,
+                min_seconds_fail_fix_resman=20,
+            )
+            is expected
         )
-        is False
-    )
 
-    # Check should pass
+
+@pytest.mark.parametrize("task_codes", [[0, 5], [-1, 0], [0, 200]])
+def test_encode_task_types_unknown_code(task_codes: List[int]) -> None:
+    """
+    Test that integer task codes outside of the known task types are rejected.
+
+    Args:
+        task_codes (List[int]): Task codes including an unknown one.
+    """
+    with pytest.raises(ValueError, match="Unknown task codes"):
+        _encode_task_types(np.array(task_codes))
+
+
+@pytest.mark.parametrize("dtype", [str, np.int8])
+def test_ensure_task_times_comply_keeps_dtype(dtype: type) -> None:
+    """
+    Test that task types are shuffled in place as strings or as integer codes.
+
+    Args:
+        dtype (type): The type of the task types given to the function.
+    """
     task_types = np.array(
         ["resman", "sysmon-light", "sysmon-scale", "comm-own", "sysmon-scale"]
     )
-    event_times = np.array([5, 20, 40, 50, 60])
-    seconds_before_comm_stop = 30
-    seconds_after_comm_start = 5
-    session_duration_seconds = 90
-    assert (
-        _check_task_times_comply(
-            task_types=task_types,
-            event_times=event_times,
-            seconds_before_comm_stop=seconds_before_comm_stop,
-            seconds_after_comm_start=seconds_after_comm_start,
-            session_duration_seconds=session_duration_seconds,
-            min_seconds_fail_fix_resman=min_seconds_fail_fix_resman,
-        )
-        is True
+    if dtype is not str:
+        task_types = _encode_task_types(task_types).astype(dtype)
+    shuffled_task_types = task_types.copy()
+    np.random.seed(0)
+    assert ensure_task_times_comply(
+        task_types=shuffled_task_types,
+        event_times=np.array([5, 20, 40, 50, 60]),
+        seconds_before_comm_stop=30,
+        seconds_after_comm_start=5,
+        min_seconds_fail_fix_resman=20,
+        session_duration_seconds=90,
     )
+    assert shuffled_task_types.dtype == task_types.dtype
+    assert sorted(shuffled_task_types.tolist()) == sorted(task_types.tolist())
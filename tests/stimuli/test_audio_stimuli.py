@@ -14,6 +14,7 @@ from matbexp.stimuli.audio_stimuli import (
 )
 
 RANDOM_STATE = 42
+_RNG = np.random.default_rng(RANDOM_STATE)
 
 
 class TestGenerateTransition:
@@ -102,7 +103,7 @@ class TestMergeWavFiles:
         sample_rate = 44100
         for i in range(3):
             file = tmpdir / f"temp{i}.wav"
-            audio = np.random.randint(-32768, 32767, size=sample_rate, dtype=np.int16)
+            audio = _RNG.integers(-32768, 32767, size=sample_rate, dtype=np.int16)
             wavfile.write(str(file), sample_rate, audio)
 
         # Use the function to merge the WAV files
@@ -1,13 +1,34 @@
 from pathlib import Path
 
+import numpy as np
 import pytest
 from pytest import TempPathFactory
 
+from matbexp.stimuli import video_stimuli
 from matbexp.stimuli.video_stimuli import (
+    _fade_frame,
+    _get_fade_opacities,
+    _make_fade_frame_function,
+    apply_opacity,
+    chunked_operation,
     generate_fixation_cross,
     generate_fixation_video,
 )
 
+FADE_SECONDS = 2
+DURATION_SECONDS = 10
+FRAME_RATE = 25
+
+RESOLUTION = (1920, 1080)
+RESOLUTION_RATIO = 0.4
+SCREEN_SIZE = (
+    int(RESOLUTION[0] * RESOLUTION_RATIO),
+    int(RESOLUTION[1] * RESOLUTION_RATIO),
+)
+SIZE_RATIO = 0.15
+CROSS_THICKNESS = 5
+CROSS_COLOR = (255, 255, 255)
+
 
 @pytest.fixture(scope="session")
 def generated_fixation_video_path(tmp_path_factory: TempPathFactory) -> Path:
@@ -24,29 +45,17 @@ def generated_fixation_video_path(tmp_path_factory: TempPathFactory) -> Path:
         tmp_path_factory.mktemp("data"), "outputs/output_video.mp4"
     )
 
-    fade_seconds = 2
-    duration_seconds = 10
-    frame_rate = 25
-
-    resolution = (1920, 1080)
-    resolution_ratio = 0.4
-    size_ratio = 0.15
-    screen_size = (
-        int(resolution[0] * resolution_ratio),
-        int(resolution[1] * resolution_ratio),
-    )
-    cross_thickness = 5
-    cross_color = (255, 255, 255)
-
     fixation_cross_image = generate_fixation_cross(
-        screen_size, size_ratio, cross_thickness, cross_color
+        SCREEN_SIZE, SIZE_RATIO, CROSS_THICKNESS, CROSS_COLOR
     )
     generate_fixation_video(
         fixation_cross_image,
         output_video_path,
-        duration_seconds,
-        frame_rate,
-        fade_seconds=fade_seconds,
+        DURATION_SECONDS,
+        FRAME_RATE,
+        fade_seconds=FADE_SECONDS,
+        # The test only checks that a video is written, not its compression
+        preset="ultrafast",
     )
     return output_video_path.resolve()
 
@@ -62,3 +71,87 @@ def test_generate_fixation_video(generated_fixation_video_path: Path) -> None:
         AssertionError: If the file does not exist at the given path.
     """
     assert generated_fixation_video_path.is_file()
+
+
+@pytest.mark.parametrize("opacity", [0, 1, 128, 155, 254, 255])
+def test_fade_frame(opacity: int) -> None:
+    """
+    Test that fading a frame scales every 8-bit value by ``opacity / 255``, rounded
+    down.
+
+    Args:
+        opacity (int): The opacity value.
+
+    Raises:
+        AssertionError: If the faded frame differs from the integer reference.
+    """
+    # Every 8-bit value, in a frame of 3 channels
+    frame = np.arange(256 * 3, dtype=np.uint16).reshape(16, 16, 3) % 256
+    frame = frame.astype(np.uint8)
+    product_buffer = np.empty(frame.shape, dtype=np.uint16)
+    frame_buffer = np.empty_like(frame)
+
+    faded_frame = _fade_frame(frame, opacity, product_buffer, frame_buffer)
+
+    assert faded_frame is frame_buffer
+    assert faded_frame.dtype == np.uint8
+    np.testing.assert_array_equal(faded_frame, frame.astype(np.uint16) * opacity // 255)
+
+
+def test_make_fade_frame_function(monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Test the opacity schedule of a fade and the frames returned at consecutive times.
+
+    Args:
+        monkeypatch (pytest.MonkeyPatch): Pytest fixture for counting the fades.
+
+    Raises:
+        AssertionError: If a frame does not have the opacity of its time in the fade.
+    """
+    frame_rate = 5
+    # 2 seconds fading out during the last second
+    opacities = _get_fade_opacities(duration=2, frame_rate=frame_rate, fade_seconds=1)
+    np.testing.assert_array_equal(opacities, [255] * 6 + [204, 153, 102, 51])
+
+    # Repeat opacities, as in long fades
+    opacities = np.array([255, 255, 100, 100, 50, 50, 0])
+    np_frame = np.arange(4 * 4 * 3, dtype=np.uint8).reshape(4, 4, 3) * 5
+    faded_opacities = []
+
+    def fade_frame(frame: np.ndarray, opacity: int, *args: np.ndarray) -> np.ndarray:
+        faded_opacities.append(opacity)
+        return _fade_frame(frame, opacity, *args)
+
+    monkeypatch.setattr(video_stimuli, "_fade_frame", fade_frame)
+    make_frame = _make_fade_frame_function(np_frame, opacities, frame_rate)
+
+    # Also request a time past the end of the video, which shows the last frame
+    for frame_count in range(len(opacities) + 1):
+        opacity = opacities[min(frame_count, len(opacities) - 1)]
+        frame = make_frame(frame_count / frame_rate)
+        if opacity == 255:
+            # Frames before the fade are the base frame itself
+            assert frame is np_frame
+        else:
+            np.testing.assert_array_equal(
+                frame, np_frame.astype(np.uint16) * opacity // 255
+            )
+    # Each opacity below 255 is only applied once
+    assert faded_opacities == [100, 50, 0]
+
+
+def test_deprecated_opacity_helpers() -> None:
+    """
+    Test that the deprecated opacity helpers still scale a frame and warn.
+
+    Raises:
+        AssertionError: If a helper does not warn or returns another frame.
+    """
+    frame = np.full((4, 4, 3), 200, dtype=np.float64)
+    with pytest.warns(DeprecationWarning, match="apply_opacity"):
+        np.testing.assert_array_equal(apply_opacity(frame, 51), frame / 5)
+    with pytest.warns(DeprecationWarning, match="chunked_operation"):
+        chunked_frame = chunked_operation(
+            frame.copy(), lambda chunk: chunk / 5, chunk_size=3
+        )
+    np.testing.assert_array_equal(chunked_frame, frame / 5)